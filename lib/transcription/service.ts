@@ -92,6 +92,22 @@ export class TranscriptionService extends EventEmitter {
         });
       }
     });
+
+    // Forward segments streamed by WhisperX so clients can render them early
+    process.on('transcription-segment' as any, (data: any) => {
+      const job = Array.from(this.jobs.values()).find(j =>
+        j.mediaFileId === data.mediaFileId && j.status === 'processing'
+      );
+
+      if (job) {
+        this.emit('transcription-segment', {
+          jobId: job.id,
+          mediaFileId: job.mediaFileId,
+          index: data.index,
+          segment: data.segment,
+        });
+      }
+    });
   }
 
   /**
@@ -536,6 +552,9 @@ export class TranscriptionService extends EventEmitter {
       await new Promise(resolve => setTimeout(resolve, 1000));
     }
 
+    // Stop the persistent WhisperX processes so their models are released
+    WhisperXTranscriber.shutdown();
+
     this.removeAllListeners();
     console.log('Transcription service shutdown complete');
   }
@@ -1,4 +1,4 @@
-import { spawn } from 'child_process';
+import { spawn, type ChildProcess } from 'child_process';
 import { z } from 'zod';
 import fs from 'fs/promises';
 import path from 'path';
@@ -53,6 +53,10 @@ export interface TranscriptionOptions {
   alignModel?: string;
   diarizeModel?: string;
   computeType?: 'int8' | 'int16' | 'float16' | 'float32';
+  backend?: 'faster-whisper' | 'ggml-q4';
+  skipAlign?: boolean;
+  fusedPipeline?: boolean;
+  fastDiarization?: boolean;
   batchSize?: number;
   minSpeakerChangeDuration?: number;
 }
@@ -93,7 +97,154 @@ export interface Speaker {
   averageConfidence: number;
 }
 
+interface WhisperXRequest {
+  payload: Record<string, unknown>;
+  mediaFileId?: string;
+  resolve: (response: Record<string, any>) => void;
+  reject: (error: Error) => void;
+}
+
+/**
+ * Long-lived `whisperx_service.py --serve` process. Models stay loaded
+ * between files; requests are written one at a time as newline-delimited
+ * JSON and each is answered by one JSON line on stdout, preceded by
+ * streamed segment records that are re-emitted as `transcription-segment`.
+ */
+class WhisperXServer {
+  private process: ChildProcess;
+  private queue: WhisperXRequest[] = [];
+  private active?: WhisperXRequest;
+  private timer?: NodeJS.Timeout;
+  private stdoutBuffer = '';
+  private stderrTail = '';
+  private exited = false;
+
+  constructor(pythonPath: string, args: string[], private onExit: (server: WhisperXServer) => void) {
+    this.process = spawn(pythonPath, args);
+    // Decode as a stream so multi-byte UTF-8 split across chunks stays intact
+    this.process.stdout!.setEncoding('utf8');
+
+    this.process.stdout!.on('data', (data) => {
+      this.stdoutBuffer += data.toString();
+      let newline = this.stdoutBuffer.indexOf('\n');
+      while (newline !== -1) {
+        const line = this.stdoutBuffer.slice(0, newline).trim();
+        this.stdoutBuffer = this.stdoutBuffer.slice(newline + 1);
+        this.handleLine(line);
+        newline = this.stdoutBuffer.indexOf('\n');
+      }
+    });
+
+    this.process.stderr!.on('data', (data) => {
+      const chunk = data.toString();
+      this.stderrTail = (this.stderrTail + chunk).slice(-4000);
+      // Only log errors and progress, not all stderr output
+      if (chunk.includes('Error') || chunk.includes('Progress:') || chunk.includes('Warning')) {
+        console.error('WhisperX:', chunk.trim());
+      }
+
+      // Progress lines belong to the request currently being processed
+      const progressMatch = chunk.match(/Progress:\s*(\d+)%/);
+      if (progressMatch && this.active) {
+        const progress = parseInt(progressMatch[1]);
+        process.emit('transcription-progress' as any, {
+          mediaFileId: this.active.mediaFileId,
+          progress,
+          message: `Processing: ${progress}%`
+        });
+      }
+    });
+
+    this.process.on('close', (code) => {
+      this.fail(new Error(`WhisperX process exited with code ${code}: ${this.stderrTail}`));
+    });
+
+    this.process.on('error', (error) => {
+      this.fail(new Error(`WhisperX process error: ${error.message}`));
+    });
+
+    // Writes after the child died (e.g. during model load or after a timeout
+    // kill) raise EPIPE here; unhandled, that would crash the Node process
+    this.process.stdin!.on('error', (error) => {
+      this.fail(new Error(`WhisperX stdin error: ${error.message}`));
+    });
+  }
+
+  request(payload: Record<string, unknown>, mediaFileId?: string): Promise<Record<string, any>> {
+    return new Promise((resolve, reject) => {
+      this.queue.push({ payload, mediaFileId, resolve, reject });
+      this.next();
+    });
+  }
+
+  shutdown(): void {
+    if (this.process.stdin?.writable) {
+      this.process.stdin.write(JSON.stringify({ cmd: 'shutdown' }) + '\n');
+      this.process.stdin.end();
+    }
+  }
+
+  private next(): void {
+    if (this.active || this.queue.length === 0) {
+      return;
+    }
+
+    this.active = this.queue.shift()!;
+    this.process.stdin!.write(JSON.stringify(this.active.payload) + '\n');
+
+    // Set timeout for long transcriptions
+    this.timer = setTimeout(() => {
+      this.fail(new Error('WhisperX transcription timeout'));
+      this.process.kill();
+    }, 30 * 60 * 1000); // 30 minutes timeout
+  }
+
+  private handleLine(line: string): void {
+    if (!line.startsWith('{') || !this.active) {
+      return; // Ignore stray library output
+    }
+
+    let response: Record<string, any>;
+    try {
+      response = JSON.parse(line);
+    } catch {
+      return;
+    }
+
+    // Streamed segment records arrive before the final response line
+    if (response.type === 'segment') {
+      process.emit('transcription-segment' as any, {
+        mediaFileId: this.active.mediaFileId,
+        index: response.index,
+        segment: response.segment,
+      });
+      return;
+    }
+
+    clearTimeout(this.timer);
+    const request = this.active;
+    this.active = undefined;
+    request.resolve(response);
+    this.next();
+  }
+
+  private fail(error: Error): void {
+    clearTimeout(this.timer);
+    const requests = this.active ? [this.active, ...this.queue] : this.queue;
+    this.active = undefined;
+    this.queue = [];
+    requests.forEach(request => request.reject(error));
+
+    // fail() runs again on 'close' after a timeout kill; only report the exit once
+    if (!this.exited) {
+      this.exited = true;
+      this.onExit(this);
+    }
+  }
+}
+
 export class WhisperXTranscriber {
+  private static servers: Map<string, WhisperXServer> = new Map();
   private pythonPath: string;
   private whisperxScript: string;
   private tempDir: string;
@@ -164,6 +315,10 @@ export class WhisperXTranscriber {
         alignModel: options.alignModel || 'WAV2VEC2_ASR_LARGE_LV60K_960H',
         diarizeModel: options.diarizeModel || 'pyannote/speaker-diarization-3.1',
         computeType: options.computeType || 'int8', // Use int8 for 4x faster CPU performance
+        skipAlign: options.skipAlign ?? false, // Whisper word timestamps instead of wav2vec2 alignment
+        fusedPipeline: options.fusedPipeline ?? false, // Transcribe + align per VAD chunk group
+        fastDiarization: options.fastDiarization ?? process.env.WHISPERX_FAST_DIARIZATION === 'true', // INT8 ONNX speaker embedding; no effect on pyannote >= 3.1
+        backend: options.backend || (process.env.WHISPERX_BACKEND as TranscriptionOptions['backend']) || 'faster-whisper',
         batchSize: options.batchSize || 24, // Optimized batch size
         minSpeakerChangeDuration: options.minSpeakerChangeDuration || 0.5,
       };
@@ -239,130 +394,104 @@ export class WhisperXTranscriber {
   }
 
   /**
-   * Run WhisperX Python subprocess
+   * Get (or start) the persistent WhisperX process for a model/device pair
    */
-  private async runWhisperX(
-    audioPath: string,
-    options: Required<TranscriptionOptions>,
-    mediaFileId?: string
-  ): Promise<z.infer<typeof WhisperXDiarizedResult>> {
-    return new Promise((resolve, reject) => {
-      const outputPath = path.join(this.tempDir, `${Date.now()}_output.json`);
-      
+  private getServer(options: Required<TranscriptionOptions>): WhisperXServer {
+    const key = [this.pythonPath, this.whisperxScript, options.model, options.device, options.backend, options.fastDiarization].join('|');
+    let server = WhisperXTranscriber.servers.get(key);
+
+    if (!server) {
       const args = [
         this.whisperxScript,
-        audioPath,  // Input file is positional argument
-        '--output', outputPath,
+        '--serve',
         '--model', options.model,
         '--device', options.device,
+        '--backend', options.backend,
       ];
-
-      // Add language if specified
-      if (options.language !== 'auto') {
-        args.push('--language', options.language);
+      if (options.fastDiarization) {
+        args.push('--fast-diar');
       }
 
-      // Add diarization options
-      if (!options.enableDiarization) {
-        args.push('--no-diarization');
-      } else {
-        if (options.maxSpeakers > 0) {
-          args.push('--max-speakers', options.maxSpeakers.toString());
-        }
-        // Add HF token from environment if available
-        const hfToken = process.env.HF_TOKEN;
-        if (hfToken) {
-          args.push('--hf-token', hfToken);
+      console.log('Starting WhisperX service:', this.pythonPath, args.join(' '));
+
+      server = new WhisperXServer(this.pythonPath, args, (exited) => {
+        // A replacement may already be registered under the same key
+        if (WhisperXTranscriber.servers.get(key) === exited) {
+          WhisperXTranscriber.servers.delete(key);
         }
-      }
+      });
+      WhisperXTranscriber.servers.set(key, server);
+    }
 
-      console.log('Running WhisperX command:', this.pythonPath, args.join(' '));
+    return server;
+  }
 
-      const whisperProcess = spawn(this.pythonPath, args);
-      let stdout = '';
-      let stderr = '';
+  /**
+   * Run a transcription request on the persistent WhisperX process
+   */
+  private async runWhisperX(
+    audioPath: string,
+    options: Required<TranscriptionOptions>,
+    mediaFileId?: string
+  ): Promise<z.infer<typeof WhisperXDiarizedResult>> {
+    const outputPath = path.join(this.tempDir, `${Date.now()}_output.json`);
+
+    const request: Record<string, unknown> = {
+      input: audioPath,
+      output: outputPath,
+      diarization: options.enableDiarization,
+      skip_align: options.skipAlign,
+      fused_pipeline: options.fusedPipeline,
+      stream: true,
+    };
 
-      whisperProcess.stdout.on('data', (data) => {
-        const chunk = data.toString();
-        stdout += chunk;
-        // Only log important messages, not the full output
-        if (chunk.includes('Progress:') || chunk.includes('Detected language:')) {
-          console.log('WhisperX:', chunk.trim());
-        }
-        
-        // Parse progress from WhisperX output
-        // Look for patterns like "Processing: 50%" or "Transcribing audio..."
-        const progressMatch = chunk.match(/(\d+)%/);
-        if (progressMatch) {
-          const progress = parseInt(progressMatch[1]);
-          // Emit progress event (this will be picked up by the service/queue)
-          process.emit('transcription-progress', {
-            mediaFileId,
-            progress,
-            message: chunk.trim()
-          });
-        }
-      });
+    // Add language if specified
+    if (options.language !== 'auto') {
+      request.language = options.language;
+    }
 
-      whisperProcess.stderr.on('data', (data) => {
-        const chunk = data.toString();
-        stderr += chunk;
-        // Only log errors and progress, not all stderr output
-        if (chunk.includes('Error') || chunk.includes('Progress:') || chunk.includes('Warning')) {
-          console.error('WhisperX:', chunk.trim());
-        }
-        
-        // Parse progress from stderr too (WhisperX outputs to stderr)
-        const progressMatch = chunk.match(/Progress:\s*(\d+)%/);
-        if (progressMatch) {
-          const progress = parseInt(progressMatch[1]);
-          // Emit progress event - mediaFileId is available in the closure scope
-          console.log(`WhisperX Progress: ${progress}% for media ${mediaFileId}`);
-          
-          // Emit progress event through Node.js process
-          process.emit('transcription-progress' as any, {
-            mediaFileId,
-            progress,
-            message: `Processing: ${progress}%`
-          });
-        }
-      });
+    // Add diarization options
+    if (options.enableDiarization) {
+      if (options.maxSpeakers > 0) {
+        request.max_speakers = options.maxSpeakers;
+      }
+      // Add HF token from environment if available
+      if (process.env.HF_TOKEN) {
+        request.hf_token = process.env.HF_TOKEN;
+      }
+    }
 
-      whisperProcess.on('close', async (code) => {
-        if (code !== 0) {
-          reject(new Error(`WhisperX process failed with code ${code}: ${stderr}`));
-          return;
-        }
+    const response = await this.getServer(options).request(request, mediaFileId);
 
-        try {
-          // Read output file
-          const outputData = await fs.readFile(outputPath, 'utf-8');
-          const result = JSON.parse(outputData);
-          
-          // Validate output schema
-          const validated = WhisperXDiarizedResult.parse(result);
-          
-          // Cleanup output file
-          await fs.unlink(outputPath).catch(() => {});
-          
-          resolve(validated);
-        } catch (parseError) {
-          reject(new Error(`Failed to parse WhisperX output: ${parseError instanceof Error ? parseError.message : 'Parse error'}`));
-        }
-      });
+    if (response.success === false) {
+      throw new Error(`WhisperX process failed: ${response.error ?? 'Unknown error'}`);
+    }
 
-      whisperProcess.on('error', (error) => {
-        reject(new Error(`WhisperX process error: ${error.message}`));
-      });
+    try {
+      // Read output file
+      const outputData = await fs.readFile(outputPath, 'utf-8');
+      const result = JSON.parse(outputData);
 
-      // Set timeout for long transcriptions
-      setTimeout(() => {
-        if (!whisperProcess.killed) {
-          whisperProcess.kill();
-          reject(new Error('WhisperX transcription timeout'));
-        }
-      }, 30 * 60 * 1000); // 30 minutes timeout
-    });
+      // Validate output schema
+      const validated = WhisperXDiarizedResult.parse(result);
+
+      // Cleanup output file
+      await fs.unlink(outputPath).catch(() => {});
+
+      return validated;
+    } catch (parseError) {
+      throw new Error(`Failed to parse WhisperX output: ${parseError instanceof Error ? parseError.message : 'Parse error'}`);
+    }
+  }
+
+  /**
+   * Stop all persistent WhisperX processes
+   */
+  static shutdown(): void {
+    for (const server of Array.from(WhisperXTranscriber.servers.values())) {
+      server.shutdown();
+    }
+    WhisperXTranscriber.servers.clear();
   }
 
   /**
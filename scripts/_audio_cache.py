@@ -0,0 +1,96 @@
+"""
+Shared decoded-audio cache for the transcription scripts
+Stores each source file as 16 kHz mono float32 PCM so repeated runs skip ffmpeg
+"""
+
+import os
+import sys
+import hashlib
+import subprocess
+import tempfile
+import numpy as np
+from pathlib import Path
+
+# Whisper models expect 16 kHz mono input
+SAMPLE_RATE = 16000
+
+CACHE_DIR = Path(os.getenv("TRANSCRIBER_CACHE_DIR") or Path.home() / ".cache" / "transcriber")
+
+# Least recently used entries are pruned once the cache grows past this size
+CACHE_MAX_BYTES = int(os.getenv("TRANSCRIBER_CACHE_MAX_MB", "2048")) * 1024 * 1024
+
+def decode_audio(path, sr=SAMPLE_RATE):
+    """
+    Decode audio to mono float32 through an ffmpeg s16le pipe
+
+    Same result as whisperx.load_audio, but the int16 samples are wrapped
+    without copying and scaled in place, avoiding the extra flatten() copy
+    and the temporary array from the division.
+    """
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sr), "-"
+    ]
+    proc = subprocess.run(cmd, capture_output=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Failed to load audio: {proc.stderr.decode(errors='ignore')}")
+
+    audio = np.frombuffer(proc.stdout, dtype=np.int16).astype(np.float32)
+    audio *= 1.0 / 32768.0
+    return audio
+
+def _prune_cache(limit=CACHE_MAX_BYTES):
+    """Delete the least recently used cache entries until the cache fits in limit bytes"""
+    entries = []
+    for entry in CACHE_DIR.glob("*.npy"):
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue  # Removed by a concurrent run
+        entries.append((stat.st_mtime, stat.st_size, entry))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            entry.unlink()
+        except OSError:
+            continue
+        total -= size
+
+def load_audio_cached(path):
+    """
+    Load 16 kHz mono float32 audio, decoding only on the first call per file version
+
+    Cached buffers are keyed by path and mtime and returned as read-only
+    np.memmap instances, so an edited source file is decoded again. Callers
+    that need an exact ndarray should wrap the result in np.asarray (a view). Entries are
+    touched on every hit and the oldest are pruned past TRANSCRIBER_CACHE_MAX_MB.
+    """
+    path = str(path)
+    key = hashlib.sha1(path.encode() + str(os.path.getmtime(path)).encode()).hexdigest()
+    cache_path = CACHE_DIR / f"{key}.npy"
+
+    if cache_path.exists():
+        try:
+            os.utime(cache_path)
+        except OSError:
+            pass
+        return np.load(cache_path, mmap_mode='r')
+
+    audio = decode_audio(path)
+    temp_path = None
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so concurrent runs never read a partial cache
+        with tempfile.NamedTemporaryFile(dir=CACHE_DIR, suffix=".tmp", delete=False) as f:
+            temp_path = f.name
+            np.save(f, audio)
+        os.replace(temp_path, cache_path)
+        _prune_cache()
+    except OSError as e:
+        print(f"Warning: could not write audio cache {cache_path}: {e}", file=sys.stderr)
+        if temp_path and os.path.exists(temp_path):
+            os.unlink(temp_path)
+    return audio
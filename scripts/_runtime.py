@@ -0,0 +1,47 @@
+"""
+Shared runtime setup for the WhisperX scripts
+Import before torch/whisperx so the thread and allocator settings apply
+"""
+
+import os
+import psutil
+from pathlib import Path
+
+# CPU threads for CTranslate2/OpenMP; must be set before torch is imported
+os.environ.setdefault("OMP_NUM_THREADS", str(os.cpu_count() or 4))
+CPU_THREADS = int(os.environ["OMP_NUM_THREADS"])
+
+# Let the CUDA caching allocator reuse blocks across files instead of
+# fragmenting on variable-length batches
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True,max_split_size_mb:512")
+
+# Prebuilt int8 CTranslate2 models from scripts/prepare_models.sh
+MODELS_DIR = Path(os.getenv("MODELS_DIR", Path(__file__).resolve().parent.parent / "models"))
+
+def resolve_model(model_size, compute_type):
+    """
+    Return the local prebuilt model directory for a size, or the size itself
+
+    The prebuilt directories hold int8 weights, so they are only used for
+    int8 compute types; float16/float32 load the original checkpoint.
+    """
+    local = MODELS_DIR / f"whisper-{model_size}-int8"
+    return str(local) if compute_type.startswith("int8") and local.is_dir() else model_size
+
+def configure_torch_threads():
+    """
+    Size torch's CPU thread pools to half the physical cores
+
+    Keeps the alignment/diarization models from oversubscribing the cores
+    CTranslate2 uses for the Whisper encoder (sized separately through
+    OMP_NUM_THREADS / CPU_THREADS).
+    """
+    import torch
+
+    physical_cores = psutil.cpu_count(logical=False) or os.cpu_count() or 2
+    torch.set_num_threads(max(1, physical_cores // 2))
+    try:
+        torch.set_num_interop_threads(2)
+    except RuntimeError:
+        # Can only be set once, before any inter-op parallel work has started
+        pass
@@ -0,0 +1,48 @@
+#!/bin/bash
+# Media Transcription Studio - Prebuild CTranslate2 Whisper models
+#
+# Converts the Whisper checkpoints to int8 CTranslate2 directories once so the
+# Python scripts can load them from models/ instead of downloading and
+# converting on first use.
+#
+# Usage: ./scripts/prepare_models.sh [size ...]   (default: tiny base small medium large-v2)
+
+set -e
+
+# Colors for output
+BLUE='\033[0;34m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+RED='\033[0;31m'
+NC='\033[0m' # No Color
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+MODELS_DIR="${MODELS_DIR:-$SCRIPT_DIR/../models}"
+SIZES=("$@")
+if [ ${#SIZES[@]} -eq 0 ]; then
+    SIZES=(tiny base small medium large-v2)
+fi
+
+if ! command -v ct2-transformers-converter &> /dev/null; then
+    echo -e "${RED}[ERROR]${NC} ct2-transformers-converter not found. Install it with: pip install ctranslate2 transformers"
+    exit 1
+fi
+
+mkdir -p "$MODELS_DIR"
+
+for size in "${SIZES[@]}"; do
+    output_dir="$MODELS_DIR/whisper-$size-int8"
+
+    if [ -d "$output_dir" ]; then
+        echo -e "${YELLOW}[SKIP]${NC} $output_dir already exists"
+        continue
+    fi
+
+    echo -e "${BLUE}[INFO]${NC} Converting openai/whisper-$size to $output_dir..."
+    ct2-transformers-converter \
+        --model "openai/whisper-$size" \
+        --quantization int8 \
+        --copy_files tokenizer.json preprocessor_config.json \
+        --output_dir "$output_dir"
+    echo -e "${GREEN}[SUCCESS]${NC} whisper-$size-int8 ready"
+done
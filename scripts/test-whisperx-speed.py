@@ -1,46 +1,81 @@
 #!/Users/vp/SAZ Projects/transcriber-cutter/venv_whisperx/bin/python
 
+import gc
 import time
-import whisperx
+
+# Sets thread/allocator environment variables, so it must come before torch
+from _runtime import CPU_THREADS, resolve_model
+
+import argparse
+import json
+import statistics
 import sys
+import torch
+import whisperx
+from _audio_cache import load_audio_cached
+
+DEFAULT_AUDIO = "/Users/vp/SAZ Projects/transcriber-cutter/test-assets/test-audio.wav"
+BATCH_SIZES = {"base": 16, "small": 32, "medium": 24}
+
+def compute_types(device):
+    """Compute types worth comparing on a device"""
+    if device == "cuda":
+        return ["float16", "int8", "int8_float16"]
+    # CTranslate2 has no float16 kernels on CPU; int8_float32 is the mixed variant there
+    return ["int8", "int8_float32"]
+
+def benchmark(model, audio, batch_size, repeat):
+    """Warm up once, then return the wall time of each run in milliseconds"""
+    model.transcribe(audio[:16000 * 5], batch_size=batch_size)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        model.transcribe(audio, batch_size=batch_size)
+        timings.append((time.perf_counter_ns() - start) / 1e6)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark WhisperX model sizes and compute types')
+    parser.add_argument('audio', nargs='?', default=DEFAULT_AUDIO, help='Audio file to transcribe')
+    parser.add_argument('--models', nargs='+', default=list(BATCH_SIZES), help='Model sizes to test')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per configuration')
+
+    args = parser.parse_args()
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    print(f"Device: {device}, CPU threads: {CPU_THREADS}", file=sys.stderr)
+
+    # Decode once and reuse the same array for every configuration
+    audio = load_audio_cached(args.audio)
+
+    for model_size in args.models:
+        batch_size = BATCH_SIZES.get(model_size, 16)
+
+        for compute in compute_types(device):
+            try:
+                model = whisperx.load_model(
+                    resolve_model(model_size, compute),
+                    device,
+                    compute_type=compute,
+                    threads=CPU_THREADS
+                )
+                timings = benchmark(model, audio, batch_size, args.repeat)
+                del model
+
+                print(json.dumps({
+                    "model": model_size,
+                    "compute": compute,
+                    "median_ms": round(statistics.median(timings), 1)
+                }), flush=True)
+
+            except Exception as e:
+                print(f"{model_size}/{compute}: {e}", file=sys.stderr)
+
+        # Release the model's allocations before loading the next size
+        gc.collect()
+        if device == "cuda":
+            torch.cuda.empty_cache()
 
-# Test different configurations
-print("Testing WhisperX performance configurations for Apple Silicon...")
-
-audio_file = "/Users/vp/SAZ Projects/transcriber-cutter/test-assets/test-audio.wav"
-
-configs = [
-    {"model": "base", "compute": "int8", "batch": 16},
-    {"model": "small", "compute": "int8", "batch": 32},
-    {"model": "medium", "compute": "int8", "batch": 24},
-]
-
-for config in configs:
-    print(f"\nTesting: Model={config['model']}, Compute={config['compute']}, Batch={config['batch']}")
-    
-    try:
-        start = time.time()
-        
-        # Load model
-        model = whisperx.load_model(
-            config["model"],
-            "cpu",
-            compute_type=config["compute"]
-        )
-        
-        # Load audio
-        audio = whisperx.load_audio(audio_file)
-        
-        # Transcribe
-        result = model.transcribe(audio, batch_size=config["batch"])
-        
-        elapsed = time.time() - start
-        print(f"  Time: {elapsed:.2f}s")
-        print(f"  Language: {result.get('language', 'unknown')}")
-        
-        del model  # Free memory
-        
-    except Exception as e:
-        print(f"  Error: {e}")
-
-print("\nRecommendation: Use 'small' or 'medium' model with int8 for best speed/quality balance")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
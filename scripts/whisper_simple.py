@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Simple Whisper Transcription Service
-Fallback service using OpenAI Whisper when WhisperX is not available
+Fallback service using faster-whisper (int8 CTranslate2) when WhisperX is not available
 """
 
 import os
@@ -9,22 +9,31 @@ import sys
 import json
 import argparse
 import warnings
-import whisper
+import orjson
+from faster_whisper import WhisperModel
 from pathlib import Path
+from _audio_cache import load_audio_cached
 
 # Suppress warnings
 warnings.filterwarnings("ignore")
 
 class SimpleWhisperTranscriber:
-    def __init__(self, model_size="base"):
+    def __init__(self, model_size="base", pretty=False):
         """
         Initialize Whisper transcriber
         
         Args:
             model_size: Whisper model size (tiny, base, small, medium, large)
+            pretty: Indent saved JSON files
         """
+        self.pretty = pretty
         print(f"Loading Whisper model '{model_size}'...", file=sys.stderr)
-        self.model = whisper.load_model(model_size)
+        self.model = WhisperModel(
+            model_size,
+            device="cpu",
+            compute_type="int8",
+            cpu_threads=os.cpu_count() or 4
+        )
         print("Model loaded successfully", file=sys.stderr)
     
     def transcribe(self, audio_path, language=None):
@@ -40,16 +49,17 @@ class SimpleWhisperTranscriber:
         """
         print(f"Processing: {audio_path}", file=sys.stderr)
         
+        audio = load_audio_cached(audio_path)
+        
         # Transcribe with Whisper
         print("Transcribing audio...", file=sys.stderr)
-        result = self.model.transcribe(
-            audio_path,
+        segments, info = self.model.transcribe(
+            audio,
             language=language,
-            word_timestamps=True,
-            verbose=False
+            word_timestamps=True
         )
         
-        detected_language = result.get("language", "unknown")
+        detected_language = info.language or "unknown"
         print(f"Detected language: {detected_language}", file=sys.stderr)
         
         # Format output
@@ -59,25 +69,25 @@ class SimpleWhisperTranscriber:
             "speakers": []  # No speaker diarization in basic Whisper
         }
         
-        # Process segments
-        for segment in result.get("segments", []):
+        # Process segments (decoded lazily as the generator is consumed)
+        for segment in segments:
             seg_data = {
-                "start": segment["start"],
-                "end": segment["end"],
-                "text": segment["text"].strip(),
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text.strip(),
                 "confidence": 1.0  # Whisper doesn't provide confidence scores
             }
             
             # Add word-level timestamps if available
-            if "words" in segment:
+            if segment.words:
                 seg_data["words"] = [
                     {
-                        "word": word.get("word", ""),
-                        "start": word.get("start", 0),
-                        "end": word.get("end", 0),
-                        "confidence": word.get("probability", 1.0)
+                        "word": word.word,
+                        "start": word.start,
+                        "end": word.end,
+                        "confidence": word.probability
                     }
-                    for word in segment["words"]
+                    for word in segment.words
                 ]
             
             output["segments"].append(seg_data)
@@ -89,14 +99,20 @@ class SimpleWhisperTranscriber:
         try:
             result = self.transcribe(input_path, **kwargs)
             
-            # Save to JSON file
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
+            # Save to JSON file (faster-whisper word timings are numpy floats)
+            option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if self.pretty else 0)
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(result, option=option))
             
             print(f"Transcription saved to: {output_path}", file=sys.stderr)
             
-            # Also output to stdout for pipe communication
-            print(json.dumps(result))
+            # The file holds the transcript; stdout only reports where it went
+            print(json.dumps({
+                "success": True,
+                "output_path": str(output_path),
+                "segments": len(result["segments"]),
+                "language": result["language"]
+            }))
             
             return True
             
@@ -116,6 +132,7 @@ def main():
                        choices=['tiny', 'base', 'small', 'medium', 'large'],
                        help='Whisper model size')
     parser.add_argument('-l', '--language', help='Language code (e.g., en, es, fr)')
+    parser.add_argument('--pretty', action='store_true', help='Indent the saved JSON file')
     
     # Compatibility arguments (ignored but accepted)
     parser.add_argument('-d', '--device', default='auto', help='Device (ignored)')
@@ -132,7 +149,7 @@ def main():
         args.output = input_path.with_suffix('.json')
     
     # Initialize transcriber
-    transcriber = SimpleWhisperTranscriber(model_size=args.model)
+    transcriber = SimpleWhisperTranscriber(model_size=args.model, pretty=args.pretty)
     
     # Process file
     success = transcriber.process_file(
@@ -6,13 +6,19 @@ Handles transcription using WhisperX with GPU acceleration
 
 import os
 import sys
-import json
 import argparse
 import logging
 from pathlib import Path
+
+# Sets thread/allocator environment variables, so it must come before torch
+from _runtime import CPU_THREADS, resolve_model, configure_torch_threads
+
 import whisperx
 import torch
 import gc
+import numpy as np
+import orjson
+from _audio_cache import load_audio_cached
 
 # Setup logging
 logging.basicConfig(
@@ -28,7 +34,9 @@ def transcribe_audio(
     device: str = "cpu",
     compute_type: str = "float32",
     batch_size: int = 16,
-    output_dir: str = None
+    output_dir: str = None,
+    skip_align: bool = False,
+    pretty: bool = False
 ):
     """
     Transcribe audio using WhisperX
@@ -41,6 +49,8 @@ def transcribe_audio(
         compute_type: Compute type for faster-whisper
         batch_size: Batch size for transcription
         output_dir: Directory to save output files
+        skip_align: Use Whisper's word timestamps instead of wav2vec2 alignment
+        pretty: Indent the saved JSON file
     
     Returns:
         Dictionary containing transcription results
@@ -52,44 +62,73 @@ def transcribe_audio(
         device = "cpu"
         compute_type = "float32"
     
+    if device == "cpu":
+        configure_torch_threads()
+    
     logger.info(f"Loading WhisperX model: {model_size}")
     logger.info(f"Using device: {device}, compute type: {compute_type}")
     
     try:
         # Load model
         model = whisperx.load_model(
-            model_size, 
+            resolve_model(model_size, compute_type), 
             device, 
             compute_type=compute_type,
-            language=language
+            language=language,
+            threads=CPU_THREADS
         )
         
         # Load audio
         logger.info(f"Loading audio from: {audio_path}")
-        audio = whisperx.load_audio(audio_path)
+        audio = load_audio_cached(audio_path)
         
         # Transcribe
         logger.info("Starting transcription...")
-        result = model.transcribe(
-            audio, 
-            batch_size=batch_size,
-            language=language
-        )
-        
-        # Align whisper output
-        logger.info("Aligning transcript...")
-        model_a, metadata = whisperx.load_align_model(
-            language_code=result["language"], 
-            device=device
-        )
-        result = whisperx.align(
-            result["segments"], 
-            model_a, 
-            metadata, 
-            audio, 
-            device, 
-            return_char_alignments=False
-        )
+        if skip_align:
+            # Whisper's own (DTW) word timestamps: faster, less precise than alignment
+            segments, info = model.model.transcribe(
+                audio,
+                language=language,
+                word_timestamps=True,
+                vad_filter=True
+            )
+            result = {
+                "language": info.language,
+                "segments": [
+                    {
+                        "start": segment.start,
+                        "end": segment.end,
+                        "text": segment.text,
+                        "words": [
+                            {"word": word.word, "start": word.start, "end": word.end, "score": word.probability}
+                            for word in segment.words or []
+                        ]
+                    }
+                    for segment in segments
+                ]
+            }
+            model_a = None
+        else:
+            result = model.transcribe(
+                audio, 
+                batch_size=batch_size,
+                language=language
+            )
+            
+            # Align whisper output
+            logger.info("Aligning transcript...")
+            model_a, metadata = whisperx.load_align_model(
+                language_code=result["language"], 
+                device=device
+            )
+            result = whisperx.align(
+                result["segments"], 
+                model_a, 
+                metadata, 
+                audio, 
+                device, 
+                return_char_alignments=False
+            )
         
         # Format output
         transcription = {
@@ -97,29 +136,29 @@ def transcribe_audio(
             "segments": []
         }
         
+        confidences: list[float] = []
         for segment in result["segments"]:
+            confidence = segment.get("score", 0.0)
+            confidences.append(confidence)
             transcription["segments"].append({
                 "id": len(transcription["segments"]),
                 "start": segment["start"],
                 "end": segment["end"],
                 "text": segment["text"].strip(),
-                "confidence": segment.get("score", 0.0),
+                "confidence": confidence,
                 "words": segment.get("words", [])
             })
         
         # Calculate overall confidence
-        if transcription["segments"]:
-            total_confidence = sum(s["confidence"] for s in transcription["segments"])
-            transcription["confidence"] = total_confidence / len(transcription["segments"])
-        else:
-            transcription["confidence"] = 0.0
+        transcription["confidence"] = float(np.mean(confidences)) if confidences else 0.0
         
         # Save output if directory specified
         if output_dir:
             output_path = Path(output_dir) / f"{Path(audio_path).stem}_transcription.json"
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(transcription, f, indent=2, ensure_ascii=False)
+            option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if pretty else 0)
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(transcription, option=option))
             logger.info(f"Saved transcription to: {output_path}")
         
         # Clean up
@@ -144,7 +183,9 @@ def main():
     parser.add_argument("--compute-type", default="float32", help="Compute type (float32, float16, int8)")
     parser.add_argument("--batch-size", type=int, default=16, help="Batch size for transcription")
     parser.add_argument("--output-dir", help="Directory to save output files")
+    parser.add_argument("--skip-align", action="store_true", help="Use Whisper's word timestamps instead of wav2vec2 alignment")
     parser.add_argument("--json", action="store_true", help="Output as JSON to stdout")
+    parser.add_argument("--pretty", action="store_true", help="Indent JSON output")
     
     args = parser.parse_args()
     
@@ -156,11 +197,14 @@ def main():
             device=args.device,
             compute_type=args.compute_type,
             batch_size=args.batch_size,
-            output_dir=args.output_dir
+            output_dir=args.output_dir,
+            skip_align=args.skip_align,
+            pretty=args.pretty
         )
         
         if args.json:
-            print(json.dumps(result, indent=2, ensure_ascii=False))
+            option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if args.pretty else 0)
+            print(orjson.dumps(result, option=option).decode())
         else:
             print(f"Transcription complete!")
             print(f"Language: {result['language']}")
@@ -9,16 +9,27 @@ import sys
 import json
 import argparse
 import warnings
+
+# Sets thread/allocator environment variables, so it must come before torch
+from _runtime import CPU_THREADS, MODELS_DIR, resolve_model, configure_torch_threads
+
 import torch
 import whisperx
 import gc
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import orjson
 from pathlib import Path
+from _audio_cache import SAMPLE_RATE, load_audio_cached
 
 # Suppress warnings
 warnings.filterwarnings("ignore")
 
+# Directory holding quantized whisper.cpp models (ggml-<size>-q4_0.bin)
+GGML_MODELS_DIR = Path(os.getenv("GGML_MODELS_DIR", MODELS_DIR))
+
 class WhisperXTranscriber:
-    def __init__(self, model_size="large-v2", device="auto", compute_type="float16"):
+    def __init__(self, model_size="large-v2", device="auto", compute_type="float16", backend="faster-whisper", pretty=False, output=None):
         """
         Initialize WhisperX transcriber
         
@@ -26,6 +37,9 @@ class WhisperXTranscriber:
             model_size: Whisper model size (tiny, base, small, medium, large, large-v2, large-v3)
             device: Device to use (cpu, cuda, or auto)
             compute_type: Compute type for faster-whisper (float16, int8, float32)
+            backend: ASR backend (faster-whisper, or ggml-q4 for whisper.cpp INT4 on CPU)
+            pretty: Indent saved JSON files
+            output: Stream for JSON response lines (default: sys.stdout, see claim_stdout)
         """
         if device == "auto":
             if torch.cuda.is_available():
@@ -39,23 +53,121 @@ class WhisperXTranscriber:
         if self.device == "cpu":
             # Use int8 for faster CPU performance on Apple Silicon
             self.compute_type = "int8"
+            configure_torch_threads()
         else:
             self.compute_type = compute_type
         
-        print(f"Loading WhisperX model '{model_size}' on {self.device}...", file=sys.stderr)
+        self.backend = "faster-whisper"
+        self.model = None
+        if backend == "ggml-q4":
+            self.model = self._load_ggml_model(model_size)
         
-        # Load WhisperX model
-        self.model = whisperx.load_model(
-            model_size, 
-            self.device, 
-            compute_type=self.compute_type,
-            language=None  # Auto-detect language
-        )
+        if self.model is None:
+            print(f"Loading WhisperX model '{model_size}' on {self.device}...", file=sys.stderr)
+            
+            # Load WhisperX model
+            self.model = whisperx.load_model(
+                resolve_model(model_size, self.compute_type), 
+                self.device, 
+                compute_type=self.compute_type,
+                language=None,  # Auto-detect language
+                threads=CPU_THREADS
+            )
         
         self.diarize_model = None
         
-    def load_diarization_model(self, hf_token=None):
-        """Load speaker diarization model"""
+        # Alignment models keyed by language code, reused across files
+        self._align_cache: dict[str, tuple] = {}
+        
+        self.pretty = pretty
+        self.output = output or sys.stdout
+        
+        # Single I/O thread: result formatting, file writes and stdout run here
+        # in submission order while the main thread moves on to the next file
+        self._io_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisperx-io")
+        
+    def _load_ggml_model(self, model_size):
+        """
+        Load a Q4_0 whisper.cpp model through pywhispercpp
+        
+        Returns None (so faster-whisper int8 is used instead) when not on CPU,
+        when pywhispercpp is missing or too old, or when the model file is missing.
+        """
+        if self.device != "cpu":
+            print("Warning: ggml-q4 backend is CPU only, using faster-whisper", file=sys.stderr)
+            return None
+        
+        model_path = GGML_MODELS_DIR / f"ggml-{model_size}-q4_0.bin"
+        if not model_path.exists():
+            print(f"Warning: {model_path} not found, using faster-whisper", file=sys.stderr)
+            return None
+        
+        try:
+            from pywhispercpp.model import Model
+        except ImportError:
+            print("Warning: pywhispercpp not installed, using faster-whisper", file=sys.stderr)
+            return None
+        
+        # Language auto-detection only exists in pywhispercpp >= 1.3
+        if not hasattr(Model, "auto_detect_language"):
+            print("Warning: pywhispercpp is too old (needs >= 1.3.0), using faster-whisper", file=sys.stderr)
+            return None
+        
+        # whisper.cpp scales with OpenMP threads (OMP_NUM_THREADS is set at import)
+        print(f"Loading whisper.cpp model '{model_path.name}' with {CPU_THREADS} threads...", file=sys.stderr)
+        model = Model(str(model_path), n_threads=CPU_THREADS, print_progress=False, print_realtime=False)
+        self.backend = "ggml-q4"
+        return model
+    
+    def _transcribe_ggml(self, audio, language=None):
+        """Transcribe with whisper.cpp and return WhisperX-style segments"""
+        # pywhispercpp treats anything but an exact ndarray (e.g. a cached memmap) as a path
+        audio = np.asarray(audio, dtype=np.float32)
+        if not language:
+            (language, _), _ = self.model.auto_detect_language(audio)
+        
+        segments = self.model.transcribe(audio, language=language)
+        
+        # whisper.cpp timestamps are in units of 10 ms
+        return {
+            "language": language,
+            "segments": [
+                {
+                    "start": segment.t0 / 100.0,
+                    "end": segment.t1 / 100.0,
+                    "text": segment.text
+                }
+                for segment in segments
+            ]
+        }
+    
+    def _get_align(self, language_code):
+        """Return (model_a, metadata) for a language, loading it on first use"""
+        if language_code not in self._align_cache:
+            self._align_cache[language_code] = whisperx.load_align_model(
+                language_code=language_code,
+                device=self.device
+            )
+        return self._align_cache[language_code]
+    
+    def close(self):
+        """Release cached models so long-running services can free VRAM"""
+        self._io_pool.shutdown(wait=True)
+        for language_code in list(self._align_cache):
+            del self._align_cache[language_code]
+        self.diarize_model = None
+        gc.collect()
+        torch.cuda.empty_cache() if self.device == "cuda" else None
+        
+    def load_diarization_model(self, hf_token=None, batch_size=64, fast=False):
+        """
+        Load speaker diarization model
+        
+        Args:
+            hf_token: Hugging Face token (defaults to HF_TOKEN)
+            batch_size: Segmentation/embedding inference batch size for pyannote
+            fast: Run an ONNX speaker-embedding model as dynamic-quantized INT8
+        """
         if not hf_token:
             hf_token = os.getenv("HF_TOKEN")
             
@@ -66,158 +178,650 @@ class WhisperXTranscriber:
         try:
             print("Loading speaker diarization model...", file=sys.stderr)
             self.diarize_model = whisperx.DiarizationPipeline(use_auth_token=hf_token, device=self.device)
+            
+            # pyannote 3.x defaults to small inference batches; larger ones
+            # keep the GPU (or CPU vector units) busy across the whole file
+            pipeline = self.diarize_model.model
+            if hasattr(pipeline, "segmentation_batch_size"):
+                pipeline.segmentation_batch_size = batch_size
+            if hasattr(pipeline, "embedding_batch_size"):
+                pipeline.embedding_batch_size = batch_size
+            if fast:
+                self._quantize_embedding(pipeline)
             return True
         except Exception as e:
             print(f"Failed to load diarization model: {e}", file=sys.stderr)
             return False
     
-    def transcribe(self, audio_path, language=None, enable_diarization=True, min_speakers=None, max_speakers=None):
+    def _quantize_embedding(self, pipeline):
         """
-        Transcribe audio file with optional speaker diarization
+        Swap the pipeline's ONNX speaker-embedding session for an INT8 one
         
-        Args:
-            audio_path: Path to audio file
-            language: Language code (e.g., 'en') or None for auto-detection
-            enable_diarization: Enable speaker diarization
-            min_speakers: Minimum number of speakers
-            max_speakers: Maximum number of speakers
+        The weights are quantized once into MODELS_DIR and reused afterwards.
+        Only applies on CPU to pipelines whose embedding runs through
+        onnxruntime (pyannote 3.0); torch embeddings, a missing onnxruntime
+        or an incompatible model keep the original embedding.
+        """
+        embedding = getattr(pipeline, "_embedding", None)
+        if self.device != "cpu" or not hasattr(embedding, "session_"):
+            print("Fast diarization needs an ONNX embedding on CPU; using the default embedding", file=sys.stderr)
+            return False
+        
+        try:
+            import onnxruntime as ort
+            from onnxruntime.quantization import quantize_dynamic, QuantType
             
-        Returns:
-            Dictionary with transcription results
+            source = Path(embedding.embedding)
+            quantized = MODELS_DIR / f"{source.stem}-int8.onnx"
+            if not quantized.exists():
+                print(f"Quantizing speaker embedding to {quantized}...", file=sys.stderr)
+                MODELS_DIR.mkdir(parents=True, exist_ok=True)
+                quantize_dynamic(str(source), str(quantized), weight_type=QuantType.QInt8)
+            
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            options.intra_op_num_threads = torch.get_num_threads()
+            providers = ["CPUExecutionProvider"]
+            if sys.platform == "darwin":
+                providers.insert(0, "CoreMLExecutionProvider")
+            providers = [p for p in providers if p in ort.get_available_providers()]
+            
+            embedding.session_ = ort.InferenceSession(str(quantized), sess_options=options, providers=providers)
+            embedding.embedding = str(quantized)
+            return True
+        except Exception as e:
+            print(f"Fast diarization unavailable, using the default embedding: {e}", file=sys.stderr)
+            return False
+    
+    def _asr(self, audio, language=None, batch_size=16):
+        """Run speech recognition with the configured backend"""
+        if self.backend == "ggml-q4":
+            return self._transcribe_ggml(audio, language=language)
+        return self.model.transcribe(
+            audio, 
+            batch_size=batch_size,
+            language=language
+        )
+    
+    def _transcribe_words(self, audio, language=None):
+        """
+        Transcribe with Whisper's own word timestamps, skipping wav2vec2 alignment
+        
+        Word boundaries come from Whisper's cross-attention (DTW) and are
+        typically less precise than forced alignment, so this suits short
+        clips and previews rather than subtitle-accurate cuts. The ggml
+        backend has no word timestamps and returns segment timings only.
         """
+        if self.backend == "ggml-q4":
+            return self._transcribe_ggml(audio, language=language)
+        
+        # The underlying faster-whisper model supports word timestamps directly
+        segments, info = self.model.model.transcribe(
+            audio,
+            language=language,
+            word_timestamps=True,
+            vad_filter=True
+        )
+        
+        return {
+            "language": info.language,
+            "segments": [
+                {
+                    "start": segment.start,
+                    "end": segment.end,
+                    "text": segment.text,
+                    "words": [
+                        {
+                            "word": word.word,
+                            "start": word.start,
+                            "end": word.end,
+                            "confidence": word.probability
+                        }
+                        for word in segment.words or []
+                    ]
+                }
+                for segment in segments
+            ]
+        }
+    
+    def _format_segment(self, segment):
+        """Convert one aligned WhisperX segment to the service output schema"""
+        seg_data = {
+            "start": segment["start"],
+            "end": segment["end"],
+            "text": segment["text"].strip(),
+            "confidence": segment.get("confidence", 1.0)
+        }
+        
+        # Add speaker information if available
+        if "speaker" in segment:
+            seg_data["speaker"] = segment["speaker"]
+        
+        # Add word-level timestamps if available
+        if "words" in segment:
+            seg_data["words"] = [
+                {
+                    "word": word["word"],
+                    "start": word["start"],
+                    "end": word["end"],
+                    "confidence": word.get("confidence", 1.0)
+                }
+                for word in segment["words"]
+            ]
+        
+        return seg_data
+    
+    def _format_output(self, result, detected_language):
+        """Convert aligned WhisperX segments to the service output schema"""
+        return {
+            "language": detected_language,
+            "segments": [self._format_segment(segment) for segment in result["segments"]],
+            "speakers": self._speaker_stats(result["segments"])
+        }
+    
+    @staticmethod
+    def _speaker_stats(segments):
+        """Per-speaker segment counts and total duration, in order of first appearance"""
+        speaker_stats = {}
+        for segment in segments:
+            if "speaker" not in segment:
+                continue
+            
+            speaker_id = segment["speaker"]
+            if speaker_id not in speaker_stats:
+                speaker_stats[speaker_id] = {
+                    "id": speaker_id,
+                    "segments": 0,
+                    "total_duration": 0
+                }
+            speaker_stats[speaker_id]["segments"] += 1
+            speaker_stats[speaker_id]["total_duration"] += segment["end"] - segment["start"]
+        
+        return list(speaker_stats.values())
+    
+    def _load_file(self, audio_path):
+        """Load one input file, reporting progress"""
         print(f"Processing: {audio_path}", file=sys.stderr)
         
         # Load audio
         print("Progress: 10%", file=sys.stderr)
-        audio = whisperx.load_audio(audio_path)
+        audio = load_audio_cached(audio_path)
         print("Progress: 20%", file=sys.stderr)
+        return audio
+    
+    def _iter_aligned(self, audio, language=None, skip_align=False, fused=False):
+        """
+        Transcribe and align audio, yielding (segments, language) per group
+        
+        Without fused the whole file is one group. With fused (faster-whisper
+        backend with alignment only) groups follow _iter_fused().
+        """
+        if fused and not skip_align and self.backend != "ggml-q4":
+            yield from self._iter_fused(audio, language=language)
+            return
         
         # Transcribe with Whisper
         print("Transcribing audio...", file=sys.stderr)
         print("Progress: 30%", file=sys.stderr)
-        result = self.model.transcribe(
-            audio, 
-            batch_size=16,
-            language=language
-        )
+        if skip_align:
+            result = self._transcribe_words(audio, language=language)
+        else:
+            result = self._asr(audio, language=language)
         print("Progress: 70%", file=sys.stderr)
         
         detected_language = result.get("language", "unknown")
         print(f"Detected language: {detected_language}", file=sys.stderr)
         
         # Align whisper output
-        print("Aligning transcript...", file=sys.stderr)
-        print("Progress: 75%", file=sys.stderr)
-        model_a, metadata = whisperx.load_align_model(
-            language_code=detected_language, 
-            device=self.device
-        )
-        print("Progress: 80%", file=sys.stderr)
-        result = whisperx.align(
-            result["segments"], 
-            model_a, 
-            metadata, 
-            audio, 
-            self.device,
-            return_char_alignments=False
-        )
+        if not skip_align:
+            print("Aligning transcript...", file=sys.stderr)
+            print("Progress: 75%", file=sys.stderr)
+            model_a, metadata = self._get_align(detected_language)
+            print("Progress: 80%", file=sys.stderr)
+            result = whisperx.align(
+                result["segments"], 
+                model_a, 
+                metadata, 
+                audio, 
+                self.device,
+                return_char_alignments=False
+            )
         print("Progress: 90%", file=sys.stderr)
         
-        # Speaker diarization
-        if enable_diarization and self.diarize_model:
-            print("Performing speaker diarization...", file=sys.stderr)
-            diarize_segments = self.diarize_model(
+        yield result["segments"], detected_language
+    
+    def _iter_fused(self, audio, language=None, batch_size=16):
+        """
+        Transcribe and align one group of VAD chunks at a time
+        
+        VAD runs once over the file with the same merge rules
+        FasterWhisperPipeline uses, and each group of batch_size chunks goes
+        straight to the batched forward pass (_transcribe_chunks) and is then
+        aligned, so a group's audio is still hot in cache for wav2vec2 and its
+        segments are available before the rest of the file is transcribed.
+        
+        Yields:
+            (aligned segments with file-relative timestamps, language) per group
+        """
+        print("Detecting speech...", file=sys.stderr)
+        chunks = self._vad_chunks(audio)
+        if not language:
+            language = self.model.detect_language(audio)
+        print(f"Detected language: {language}", file=sys.stderr)
+        
+        if not chunks:
+            yield [], language
+            return
+        
+        model_a, metadata = self._get_align(language)
+        for i in range(0, len(chunks), batch_size):
+            group = chunks[i:i + batch_size]
+            segments = self._transcribe_chunks([(audio, chunk) for chunk in group], language, batch_size=batch_size)
+            
+            result = whisperx.align(
+                segments,
+                model_a,
+                metadata,
                 audio,
-                min_speakers=min_speakers,
-                max_speakers=max_speakers
+                self.device,
+                return_char_alignments=False
             )
             
-            # Assign speakers to segments
-            result = whisperx.assign_word_speakers(diarize_segments, result)
+            done = min(i + batch_size, len(chunks))
+            print(f"Progress: {30 + 60 * done // len(chunks)}%", file=sys.stderr)
+            yield result["segments"], language
+    
+    def _diarize(self, audio, result, min_speakers=None, max_speakers=None):
+        """Assign diarization speaker labels to aligned segments"""
+        print("Performing speaker diarization...", file=sys.stderr)
+        diarize_segments = self.diarize_model(
+            audio,
+            min_speakers=min_speakers,
+            max_speakers=max_speakers
+        )
+        
+        # Assign speakers to segments
+        return whisperx.assign_word_speakers(diarize_segments, result)
+    
+    def transcribe(self, audio_path, language=None, enable_diarization=True, min_speakers=None, max_speakers=None, skip_align=False, fused=False):
+        """
+        Transcribe audio file with optional speaker diarization
+        
+        Args:
+            audio_path: Path to audio file
+            language: Language code (e.g., 'en') or None for auto-detection
+            enable_diarization: Enable speaker diarization
+            min_speakers: Minimum number of speakers
+            max_speakers: Maximum number of speakers
+            skip_align: Use Whisper's own word timestamps instead of wav2vec2 alignment
+            fused: Transcribe and align VAD chunk groups in one pass (see _iter_fused)
             
-        # Format output
-        output = {
+        Returns:
+            Dictionary with transcription results
+        """
+        return self._format_output(*self._transcribe_raw(
+            audio_path, language, enable_diarization, min_speakers, max_speakers, skip_align, fused
+        ))
+    
+    def _transcribe_raw(self, audio_path, language=None, enable_diarization=True, min_speakers=None, max_speakers=None, skip_align=False, fused=False):
+        """Run the pipeline for transcribe(); returns (WhisperX result, language) before formatting"""
+        audio = self._load_file(audio_path)
+        
+        segments = []
+        detected_language = language or "unknown"
+        for group, detected_language in self._iter_aligned(audio, language, skip_align, fused):
+            segments.extend(group)
+        result = {"segments": segments}
+        
+        # Speaker diarization
+        if enable_diarization and self.diarize_model:
+            result = self._diarize(audio, result, min_speakers, max_speakers)
+        
+        return result, detected_language
+    
+    def iter_transcribe(self, audio_path, language=None, enable_diarization=True, min_speakers=None, max_speakers=None, skip_align=False, fused=False):
+        """
+        Transcribe audio file, yielding records as soon as they are available
+        
+        Yields {"type": "segment", "index": i, "segment": {...}} for every
+        aligned segment, the same indices again with speaker labels once
+        diarization has run, and finally {"type": "summary", "language": ...,
+        "speakers": [...], "segments": count}. Arguments match transcribe().
+        """
+        audio = self._load_file(audio_path)
+        
+        segments = []
+        detected_language = language or "unknown"
+        for group, detected_language in self._iter_aligned(audio, language, skip_align, fused):
+            for segment in group:
+                yield {"type": "segment", "index": len(segments), "segment": self._format_segment(segment)}
+                segments.append(segment)
+        result = {"segments": segments}
+        
+        # Speaker diarization
+        if enable_diarization and self.diarize_model:
+            result = self._diarize(audio, result, min_speakers, max_speakers)
+            for index, segment in enumerate(result["segments"]):
+                yield {"type": "segment", "index": index, "segment": self._format_segment(segment)}
+        
+        yield {
+            "type": "summary",
             "language": detected_language,
-            "segments": [],
-            "speakers": []
+            "speakers": self._speaker_stats(result["segments"]),
+            "segments": len(result["segments"])
         }
+    
+    def _vad_chunks(self, audio, chunk_size=30):
+        """Speech chunks for one audio array, using the pipeline's VAD model and merge rules"""
+        from whisperx.vad import merge_chunks
         
-        # Process segments
-        speaker_stats = {}
-        for segment in result["segments"]:
-            seg_data = {
-                "start": segment["start"],
-                "end": segment["end"],
-                "text": segment["text"].strip(),
-                "confidence": segment.get("confidence", 1.0)
-            }
+        vad_segments = self.model.vad_model({
+            "waveform": torch.from_numpy(audio).unsqueeze(0),
+            "sample_rate": SAMPLE_RATE
+        })
+        return merge_chunks(
+            vad_segments,
+            chunk_size,
+            onset=self.model._vad_params["vad_onset"],
+            offset=self.model._vad_params["vad_offset"]
+        )
+    
+    def _transcribe_chunks(self, pieces, language, batch_size=16):
+        """
+        Run the batched Whisper forward pass over precomputed VAD chunks
+        
+        Same steps as FasterWhisperPipeline.transcribe() after its own VAD
+        pass, so callers that already have chunks do not run VAD again.
+        
+        Args:
+            pieces: (audio, chunk) pairs; chunk times are relative to that audio
+            language: Language code to decode with
+            batch_size: Chunks per encoder batch
             
-            # Add speaker information if available
-            if "speaker" in segment:
-                speaker_id = segment["speaker"]
-                seg_data["speaker"] = speaker_id
-                
-                # Track speaker statistics
-                if speaker_id not in speaker_stats:
-                    speaker_stats[speaker_id] = {
-                        "id": speaker_id,
-                        "segments": 0,
-                        "total_duration": 0
-                    }
-                speaker_stats[speaker_id]["segments"] += 1
-                speaker_stats[speaker_id]["total_duration"] += segment["end"] - segment["start"]
+        Returns:
+            One {"text", "start", "end"} segment per chunk, in order
+        """
+        from faster_whisper.tokenizer import Tokenizer
+        
+        pipeline = self.model
+        pipeline.tokenizer = Tokenizer(
+            pipeline.model.hf_tokenizer,
+            pipeline.model.model.is_multilingual,
+            task="transcribe",
+            language=language
+        )
+        
+        def inputs():
+            for audio, chunk in pieces:
+                yield {"inputs": audio[int(chunk["start"] * SAMPLE_RATE):int(chunk["end"] * SAMPLE_RATE)]}
+        
+        segments = []
+        try:
+            for (_, chunk), out in zip(pieces, pipeline(inputs(), batch_size=batch_size, num_workers=0)):
+                text = out["text"]
+                if batch_size in (0, 1, None):
+                    text = text[0]
+                segments.append({
+                    "text": text,
+                    "start": round(chunk["start"], 3),
+                    "end": round(chunk["end"], 3)
+                })
+        finally:
+            # transcribe() re-detects the language per call unless one was preset
+            if pipeline.preset_language is None:
+                pipeline.tokenizer = None
+        return segments
+    
+    def transcribe_batch(self, audio_paths, language=None, enable_diarization=True, min_speakers=None, max_speakers=None, skip_align=False, batch_size=32):
+        """
+        Transcribe several files in one encoder pass
+        
+        VAD runs on each file separately, then the chunks of all files share
+        encoder batches, so no chunk (and no segment) spans two files. Each
+        file is aligned and diarized against its own audio. All files are
+        assumed to share the language detected on the first file. Whisper
+        word timestamps (skip_align) and the ggml backend have no batched
+        encoder to share and transcribe file by file.
+        
+        Returns:
+            List of result dictionaries, one per input path
+        """
+        print(f"Processing batch of {len(audio_paths)} files", file=sys.stderr)
+        
+        print("Progress: 10%", file=sys.stderr)
+        audios = [load_audio_cached(path) for path in audio_paths]
+        print("Progress: 20%", file=sys.stderr)
+        
+        if skip_align or self.backend == "ggml-q4":
+            aligned = [next(self._iter_aligned(audio, language, skip_align)) for audio in audios]
+        else:
+            # Chunk each file on its own, remembering which file a chunk came from
+            print("Detecting speech...", file=sys.stderr)
+            chunks = [(index, chunk) for index, audio in enumerate(audios) for chunk in self._vad_chunks(audio)]
+            if not language:
+                language = self.model.detect_language(audios[0])
+            print(f"Detected language: {language}", file=sys.stderr)
             
-            # Add word-level timestamps if available
-            if "words" in segment:
-                seg_data["words"] = [
-                    {
-                        "word": word["word"],
-                        "start": word["start"],
-                        "end": word["end"],
-                        "confidence": word.get("confidence", 1.0)
-                    }
-                    for word in segment["words"]
-                ]
+            # Transcribe the chunks of all files together
+            print("Transcribing audio...", file=sys.stderr)
+            print("Progress: 30%", file=sys.stderr)
+            segments = self._transcribe_chunks(
+                [(audios[index], chunk) for index, chunk in chunks], language, batch_size=batch_size
+            )
+            print("Progress: 70%", file=sys.stderr)
             
-            output["segments"].append(seg_data)
-        
-        # Add speaker information
-        output["speakers"] = list(speaker_stats.values())
+            per_file = [[] for _ in audios]
+            for (index, _), segment in zip(chunks, segments):
+                per_file[index].append(segment)
+            
+            # Align each file against its own audio
+            print("Aligning transcript...", file=sys.stderr)
+            print("Progress: 75%", file=sys.stderr)
+            model_a, metadata = self._get_align(language)
+            aligned = [
+                (whisperx.align(
+                    file_segments,
+                    model_a,
+                    metadata,
+                    audio,
+                    self.device,
+                    return_char_alignments=False
+                )["segments"], language)
+                for audio, file_segments in zip(audios, per_file)
+            ]
+            print("Progress: 90%", file=sys.stderr)
         
-        # Clean up
-        del model_a
-        gc.collect()
-        torch.cuda.empty_cache() if self.device == "cuda" else None
+        outputs = []
+        for audio, (segments, detected_language) in zip(audios, aligned):
+            file_result = {"segments": segments}
+            
+            # Speaker diarization
+            if enable_diarization and self.diarize_model:
+                file_result = self._diarize(audio, file_result, min_speakers, max_speakers)
+            
+            outputs.append(self._format_output(file_result, detected_language))
         
-        return output
+        return outputs
+    
+    def _emit(self, line):
+        """Write one response line; only called on the I/O thread (or while it is idle) so lines stay ordered"""
+        self.output.write(line + "\n")
+        self.output.flush()
+    
+    def _fail(self, error):
+        """Report an error on stdout"""
+        self._emit(json.dumps({"error": str(error), "success": False}))
+        return False
     
-    def process_file(self, input_path, output_path, **kwargs):
-        """Process a single file and save results"""
+    def _save(self, output_path, result, response=None):
+        """Save a result to JSON, then echo the response (default: a short status) on stdout"""
         try:
-            result = self.transcribe(input_path, **kwargs)
-            
-            # Save to JSON file
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
+            option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if self.pretty else 0)
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(result, option=option))
             
             print(f"Transcription saved to: {output_path}", file=sys.stderr)
             
-            # Also output to stdout for pipe communication
-            print(json.dumps(result))
-            
+            # The file holds the transcript; stdout only reports where it went
+            if response is None:
+                response = {
+                    "success": True,
+                    "output_path": str(output_path),
+                    "segments": len(result["segments"]),
+                    "language": result["language"]
+                }
+            self._emit(orjson.dumps(response, option=orjson.OPT_SERIALIZE_NUMPY).decode())
             return True
+        except Exception as e:
+            return self._fail(e)
+    
+    def _format_and_save(self, output_path, result, detected_language):
+        """Build the output schema (incl. speaker stats) off the main thread and save it"""
+        try:
+            output = self._format_output(result, detected_language)
+        except Exception as e:
+            return self._fail(e)
+        return self._save(output_path, output)
+    
+    def process_batch(self, input_paths, output_paths, wait=True, **kwargs):
+        """
+        Process several files with transcribe_batch and save each result
+        
+        Saving runs on the I/O thread. With wait=False the list of futures
+        (each resolving to True/False) is returned so the caller can start on
+        the next batch while results are written.
+        """
+        try:
+            results = self.transcribe_batch(input_paths, **kwargs)
+            futures = [
+                self._io_pool.submit(self._save, output_path, result)
+                for output_path, result in zip(output_paths, results)
+            ]
+        except Exception as e:
+            futures = [self._io_pool.submit(self._fail, e)]
+        
+        if wait:
+            return all(future.result() for future in futures)
+        return futures
+    
+    def process_file(self, input_path, output_path, stream=False, wait=True, **kwargs):
+        """
+        Process a single file and save results
+        
+        With stream=True, segment records from iter_transcribe() are written
+        to stdout as newline-delimited JSON while the file is processed, and
+        the final line is the summary record instead of the full result.
+        
+        Formatting, saving and stdout output run on the I/O thread. With
+        wait=False a future resolving to True/False is returned instead of
+        the result, so the next file can start transcribing meanwhile.
+        """
+        try:
+            if stream:
+                segments = {}
+                summary = None
+                for record in self.iter_transcribe(input_path, **kwargs):
+                    if record["type"] == "segment":
+                        segments[record["index"]] = record["segment"]
+                        self._io_pool.submit(self._emit, orjson.dumps(record, option=orjson.OPT_SERIALIZE_NUMPY).decode())
+                    else:
+                        summary = record
+                
+                result = {
+                    "language": summary["language"],
+                    "segments": [segments[index] for index in range(summary["segments"])],
+                    "speakers": summary["speakers"]
+                }
+                summary.update(success=True, output_path=str(output_path))
+                future = self._io_pool.submit(self._save, output_path, result, summary)
+            else:
+                result, detected_language = self._transcribe_raw(input_path, **kwargs)
+                future = self._io_pool.submit(self._format_and_save, output_path, result, detected_language)
             
         except Exception as e:
-            error_result = {
-                "error": str(e),
-                "success": False
-            }
-            print(json.dumps(error_result))
-            return False
+            future = self._io_pool.submit(self._fail, e)
+        
+        return future.result() if wait else future
+
+def claim_stdout():
+    """
+    Reserve the real stdout for JSON response lines
+    
+    Returns a text stream on a duplicate of fd 1, then points fd 1 and
+    sys.stdout at stderr. Library print() calls (e.g. whisperx's
+    "Detected language") and native logging run on the main thread while
+    responses are written from the I/O thread; sent to stderr they can no
+    longer split or prefix a response line.
+    """
+    sys.stdout.flush()
+    output = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    return output
+
+def serve(transcriber, args):
+    """
+    Handle newline-delimited JSON requests on stdin until EOF or shutdown
+    
+    Each request is an object with an "input" path and optional "output",
+    "language", "diarization", "min_speakers", "max_speakers", "skip_align",
+    "fused_pipeline", "stream" and "hf_token" fields. Each response is
+    written to stdout as a single JSON line, preceded by segment records
+    when streaming. Send {"cmd": "shutdown"} to stop the loop and release
+    the models.
+    """
+    print("Ready", file=sys.stderr)
+    
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            transcriber._emit(json.dumps({"error": f"Invalid request: {e}", "success": False}))
+            continue
+        
+        if not isinstance(request, dict):
+            transcriber._emit(json.dumps({"error": "Invalid request: expected a JSON object", "success": False}))
+            continue
+        
+        if request.get("cmd") == "shutdown":
+            break
+        
+        input_path = request.get("input")
+        if not input_path:
+            transcriber._emit(json.dumps({"error": "Request is missing 'input'", "success": False}))
+            continue
+        
+        output_path = request.get("output") or Path(input_path).with_suffix('.json')
+        enable_diarization = request.get("diarization", not args.no_diarization)
+        
+        # Diarization model stays resident once loaded
+        if enable_diarization and not transcriber.diarize_model:
+            transcriber.load_diarization_model(
+                request.get("hf_token") or args.hf_token, batch_size=args.diarization_batch_size,
+                fast=args.fast_diar
+            )
+        
+        transcriber.process_file(
+            input_path,
+            output_path,
+            language=request.get("language"),
+            enable_diarization=enable_diarization,
+            min_speakers=request.get("min_speakers"),
+            max_speakers=request.get("max_speakers"),
+            skip_align=request.get("skip_align", args.skip_align),
+            fused=request.get("fused_pipeline", args.fused_pipeline),
+            stream=request.get("stream", args.stream)
+        )
+    
+    transcriber.close()
 
 def main():
     parser = argparse.ArgumentParser(description='WhisperX Transcription Service')
-    parser.add_argument('input', help='Input audio/video file path')
+    parser.add_argument('input', nargs='*', help='Input audio/video file path(s)')
     parser.add_argument('-o', '--output', help='Output JSON file path')
     parser.add_argument('-m', '--model', default='large-v2', help='Whisper model size')
     parser.add_argument('-d', '--device', default='auto', choices=['auto', 'cpu', 'cuda'], help='Device to use')
@@ -226,34 +830,85 @@ def main():
     parser.add_argument('--min-speakers', type=int, help='Minimum number of speakers')
     parser.add_argument('--max-speakers', type=int, help='Maximum number of speakers')
     parser.add_argument('--hf-token', help='Hugging Face token for diarization')
+    parser.add_argument('--diarization-batch-size', type=int, default=64,
+                        help='Batch size for diarization segmentation and embedding inference')
+    parser.add_argument('--fast-diar', action='store_true',
+                        help='Run an ONNX speaker embedding as quantized INT8 (CPU only, needs onnxruntime; '
+                             'no-op on pyannote >= 3.1, whose embedding runs in torch)')
+    parser.add_argument('--skip-align', action='store_true',
+                        help="Use Whisper's word timestamps instead of wav2vec2 alignment (faster, less precise)")
+    parser.add_argument('--backend', default='faster-whisper', choices=['faster-whisper', 'ggml-q4'],
+                        help='ASR backend (ggml-q4 runs a Q4_0 whisper.cpp model on CPU)')
+    parser.add_argument('--fused-pipeline', action='store_true',
+                        help='Transcribe and align groups of VAD chunks in one pass instead of whole-file stages')
+    parser.add_argument('--stream', action='store_true',
+                        help='Write segment records to stdout as newline-delimited JSON while transcribing')
+    parser.add_argument('--batch-files', type=int, default=1,
+                        help='Transcribe up to N input files together in one encoder pass')
+    parser.add_argument('--pretty', action='store_true', help='Indent the saved JSON file')
+    parser.add_argument('--serve', action='store_true', help='Keep models loaded and read JSON requests from stdin')
     
     args = parser.parse_args()
     
-    # Set output path if not provided
-    if not args.output:
-        input_path = Path(args.input)
-        args.output = input_path.with_suffix('.json')
+    # Validate before any model is loaded
+    if not args.serve and not args.input:
+        parser.error('input is required unless --serve is given')
+    if len(args.input) > 1 and args.output:
+        parser.error('--output can only be used with a single input')
+    if args.stream and args.batch_files > 1:
+        parser.error('--stream cannot be combined with --batch-files')
+    if args.fused_pipeline and args.batch_files > 1:
+        parser.error('--fused-pipeline cannot be combined with --batch-files')
     
     # Initialize transcriber
     transcriber = WhisperXTranscriber(
         model_size=args.model,
-        device=args.device
+        device=args.device,
+        backend=args.backend,
+        pretty=args.pretty,
+        output=claim_stdout()
     )
     
+    if args.serve:
+        serve(transcriber, args)
+        sys.exit(0)
+    
+    # Set output path if not provided
+    if not args.output:
+        output_paths = [Path(path).with_suffix('.json') for path in args.input]
+    else:
+        output_paths = [args.output]
+    
     # Load diarization model if needed
     if not args.no_diarization:
-        transcriber.load_diarization_model(args.hf_token)
+        transcriber.load_diarization_model(
+            args.hf_token, batch_size=args.diarization_batch_size, fast=args.fast_diar
+        )
     
-    # Process file
-    success = transcriber.process_file(
-        args.input,
-        args.output,
+    options = dict(
         language=args.language,
         enable_diarization=not args.no_diarization,
         min_speakers=args.min_speakers,
-        max_speakers=args.max_speakers
+        max_speakers=args.max_speakers,
+        skip_align=args.skip_align
     )
     
+    # Process files, batching them through the encoder when requested.
+    # Results are saved in the background while the next file transcribes.
+    pending = []
+    batch_files = max(1, args.batch_files)
+    for i in range(0, len(args.input), batch_files):
+        inputs = args.input[i:i + batch_files]
+        outputs = output_paths[i:i + batch_files]
+        if len(inputs) == 1:
+            pending.append(transcriber.process_file(
+                inputs[0], outputs[0], fused=args.fused_pipeline, stream=args.stream, wait=False, **options
+            ))
+        else:
+            pending.extend(transcriber.process_batch(inputs, outputs, wait=False, **options))
+    
+    success = all([future.result() for future in pending])
+    
     sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
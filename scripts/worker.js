@@ -162,9 +162,19 @@ class MediaWorker {
       args.push('--hf-token', process.env.HF_TOKEN);
     }
 
-    // Run transcription
+    // Run transcription; the last JSON line on stdout is the status, the
+    // transcript is in the output file (whisperx also prints plain text lines)
     const result = await this.runProcess(pythonPath, args);
-    const transcriptionResult = JSON.parse(result);
+    const statusLine = result.split('\n').map(line => line.trim()).filter(line => line.startsWith('{')).pop();
+    if (!statusLine) {
+      throw new Error('Transcription produced no status output');
+    }
+
+    const status = JSON.parse(statusLine);
+    if (!status.success) {
+      throw new Error(`Transcription failed: ${status.error || 'Unknown error'}`);
+    }
+    const transcriptionResult = JSON.parse(await fs.readFile(status.output_path, 'utf8'));
 
     // Save transcript to database
     await this.saveTranscript(mediaFileId, transcriptionResult, options);
@@ -331,6 +341,8 @@ class MediaWorker {
       const process = spawn(command, args, {
         stdio: ['ignore', 'pipe', 'pipe']
       });
+      // Decode as a stream so multi-byte UTF-8 split across chunks stays intact
+      process.stdout.setEncoding('utf8');
 
       let stdout = '';
       let stderr = '';